@@ -1,7 +1,8 @@
-import requests, my_openai, time, html, os
+import requests, my_openai, search_index, time, html, os, re
 from bs4 import BeautifulSoup
-from typing import Optional, List
+from typing import Optional, List, Callable
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
 # 네이버 오픈 API 클라이언트 정보
@@ -14,11 +15,84 @@ if not client_id or not client_secret:
         "OS 환경변수 설정 후 다시 실행하세요."
     )
 
+# 네이버 뉴스 검색 API 엔드포인트 (벤치마크 시 로컬 서버로 교체 가능)
+NAVER_NEWS_URL = 'https://openapi.naver.com/v1/search/news.json'
+
+# UA 없으면 일부 언론사에서 차단하는 경우가 있어서 추가
+ARTICLE_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/129.0.0.0 Safari/537.36'
+    )
+}
+
+
+def parse_article_body(page_html: str) -> Optional[str]:
+    """
+    네이버 뉴스 원문 HTML에서
+    <article id="dic_area" class="go_trans _article_content"> 안의 텍스트만 추출.
+    구조가 다르면 None 반환.
+    """
+    soup = BeautifulSoup(page_html, 'html.parser')
+
+    # 네이버 뉴스 기사 본문 영역
+    contents_div = soup.find('div', id='contents', class_='newsct_body')
+    if not contents_div:
+        # 구조가 다르면 스킵
+        return None
+
+    article_tag = contents_div.find('article', id='dic_area', class_='go_trans _article_content')
+    if not article_tag:
+        # 원하는 구조의 문서가 아니면 스킵
+        return None
+
+    # 줄바꿈 처리: <br> -> \n
+    for br in article_tag.find_all('br'):
+        br.replace_with('\n')
+
+    # 사진 캡션, 스크립트 등 불필요 태그 제거 (필요시 더 추가)
+    for tag in article_tag.find_all(['script', 'style']):
+        tag.decompose()
+
+    # 텍스트 추출
+    # (strip=True 를 쓰면 <br> 에서 바꾼 '\n' 문자열까지 지워져 문단이 사라지므로
+    #  공백 정리는 아래 줄 단위 정리에 맡긴다)
+    text = article_tag.get_text(separator=' ')
+
+    # 개행 기준으로 한번 정리
+    # (원문 예시처럼 문단 사이에 <br> 두 개씩 있을 때 어느 정도 복원)
+    lines = [' '.join(line.split()) for line in text.split('\n')]
+    lines = [line for line in lines if line]  # 빈 줄 제거
+    cleaned_text = '\n'.join(lines)
+
+    return cleaned_text
+
+
+# 본문 크롤링
+def get_article_body(article_url: str) -> Optional[str]:
+    """
+    네이버 뉴스 원문 페이지를 받아 parse_article_body로 본문 추출.
+    요청 실패 또는 구조가 다르면 None 반환.
+    """
+    try:
+        res = requests.get(article_url, headers=ARTICLE_HEADERS, timeout=10)
+    except requests.RequestException as e:
+        print(f'[ERROR] 기사 요청 실패: {article_url} / {e}')
+        return None
+
+    if res.status_code != 200:
+        print(f'[ERROR] 기사 응답 코드: {article_url} / {res.status_code}')
+        return None
+
+    return parse_article_body(res.text)
+
+
 def news_crawling_to_excel(query):
 
     # 검색어와 요청 파라미터
 
-    url = 'https://openapi.naver.com/v1/search/news.json'
+    url = NAVER_NEWS_URL
     params = {
         'query': query,
         'display': 100,
@@ -32,67 +106,6 @@ def news_crawling_to_excel(query):
         'X-Naver-Client-Secret': client_secret
     }
 
-    # 본문 크롤링
-    def get_article_body(article_url: str) -> Optional[str]:
-        """
-        네이버 뉴스 원문 페이지에서
-        <article id="dic_area" class="go_trans _article_content"> 안의 텍스트만 추출.
-        구조가 다르면 None 반환.
-        """
-        try:
-            res = requests.get(
-                article_url,
-                headers={
-                    # UA 없으면 일부 언론사에서 차단하는 경우가 있어서 추가
-                    'User-Agent': (
-                        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                        'AppleWebKit/537.36 (KHTML, like Gecko) '
-                        'Chrome/129.0.0.0 Safari/537.36'
-                    )
-                },
-                timeout=10,
-            )
-        except requests.RequestException as e:
-            print(f'[ERROR] 기사 요청 실패: {article_url} / {e}')
-            return None
-
-        if res.status_code != 200:
-            print(f'[ERROR] 기사 응답 코드: {article_url} / {res.status_code}')
-            return None
-
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        # 네이버 뉴스 기사 본문 영역
-        contents_div = soup.find('div', id='contents', class_='newsct_body')
-        if not contents_div:
-            # 구조가 다르면 스킵
-            return None
-
-        article_tag = contents_div.find('article', id='dic_area', class_='go_trans _article_content')
-        if not article_tag:
-            # 원하는 구조의 문서가 아니면 스킵
-            return None
-
-        # 줄바꿈 처리: <br> -> \n
-        for br in article_tag.find_all('br'):
-            br.replace_with('\n')
-
-        # 사진 캡션, 스크립트 등 불필요 태그 제거 (필요시 더 추가)
-        for tag in article_tag.find_all(['script', 'style']):
-            tag.decompose()
-
-        # 텍스트 추출
-        text = article_tag.get_text(separator=' ', strip=True)
-
-        # 개행 기준으로 한번 정리
-        # (원문 예시처럼 문단 사이에 <br> 두 개씩 있을 때 어느 정도 복원)
-        lines = [line.strip() for line in text.split('\n')]
-        lines = [line for line in lines if line]  # 빈 줄 제거
-        cleaned_text = '\n'.join(lines)
-
-        return cleaned_text
-
-
     # API 요청
     response = requests.get(url, headers=headers, params=params)
 
@@ -163,26 +176,155 @@ def convert_date(raw_date: str) -> str:
         return raw_date  # 변환 실패 시 원문 유지
 
 
-def summarize_article(body_text: str, max_len: int = 150) -> str:
+# 한국어 요약 1자당 토큰 수 (여유 있게 잡은 값) + 문장 마무리용 여유분
+SUMMARY_TOKENS_PER_CHAR = 1.0
+SUMMARY_TOKEN_MARGIN = 20
+
+
+def summary_max_tokens(max_len: int) -> int:
     """
-    뉴스 본문을 OpenAI API로 요약.
+    요약 글자 수 제한(max_len)을 서버에서 생성을 끊을 max_tokens 값으로 환산.
     """
-    if not isinstance(body_text, str) or not body_text.strip():
-        return ""
+    return int(max_len * SUMMARY_TOKENS_PER_CHAR) + SUMMARY_TOKEN_MARGIN
+
+
+# 긴 기사는 문단 단위로 나눠 부분 요약 후 합침 (map-reduce)
+LONG_ARTICLE_CHARS = 3000   # 이 길이를 넘는 본문만 나눠서 요약
+CHUNK_CHARS = 1500          # 부분 요약 한 번에 보내는 최대 글자 수
+CHUNK_WORKERS = 4           # 부분 요약 동시 호출 수
+
 
-    system_content: List[str] = [
+def build_summary_system_content(max_len: int) -> List[str]:
+    return [
         "당신은 한국어 뉴스를 요약하는 보조자입니다.",
         f"요약은 {max_len}자 이내로 핵심 내용만 정리하세요.",
         "숫자, 기관명, 날짜는 가능한 그대로 보존하세요."
     ]
 
+
+def ask_summary(
+    system_content: List[str],
+    prompt: str,
+    max_len: int,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    요약 요청 1회. max_len에서 환산한 max_tokens로 서버에서 길이를 끊는다.
+    """
+    max_tokens = summary_max_tokens(max_len)
+
+    if not stream:
+        return my_openai.question(system_content, prompt, max_tokens=max_tokens)
+
+    pieces = []
+    for piece in my_openai.question_stream(system_content, prompt, max_tokens=max_tokens):
+        pieces.append(piece)
+        if on_token:
+            on_token(piece)
+    return "".join(pieces)
+
+
+def split_into_chunks(body_text: str, chunk_chars: int = CHUNK_CHARS) -> List[str]:
+    """
+    본문을 문단('\n') 경계에서 chunk_chars 이하 덩어리로 묶는다.
+    한 문단이 chunk_chars보다 길면 문장 단위로, 그래도 길면 글자 수로 자른다.
+    """
+    units = []
+    for paragraph in body_text.split('\n'):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= chunk_chars:
+            units.append(paragraph)
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+            for i in range(0, len(sentence), chunk_chars):
+                units.append(sentence[i:i + chunk_chars])
+
+    chunks = []
+    current = ""
+    for unit in units:
+        if current and len(current) + 1 + len(unit) > chunk_chars:
+            chunks.append(current)
+            current = unit
+        else:
+            current = f"{current}\n{unit}" if current else unit
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def summarize_long_article(
+    body_text: str,
+    max_len: int = 150,
+    chunk_chars: int = CHUNK_CHARS,
+    max_workers: int = CHUNK_WORKERS,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    긴 뉴스 본문 요약 (map-reduce).
+    1) 문단 경계에서 chunk_chars 이하로 분할
+    2) 각 부분을 동시에 요약
+    3) 부분 요약들을 다시 max_len 이내 최종 요약으로 합침
+    한 부분이라도 요약에 실패하면 일부만으로 만든 요약을 내지 않고 RuntimeError.
+    """
+    chunks = split_into_chunks(body_text, chunk_chars)
+    system_content = build_summary_system_content(max_len)
+
+    def summarize_chunk(numbered):
+        n, chunk = numbered
+        prompt = (
+            f"다음은 한국어 뉴스 기사 본문의 일부({n}/{len(chunks)})입니다. 핵심 내용을 요약해 주세요.\n\n"
+            f"{chunk}"
+        )
+        return ask_summary(system_content, prompt, max_len) or ""
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        partials = list(executor.map(summarize_chunk, enumerate(chunks, start=1)))
+
+    failed = [n for n, p in enumerate(partials, start=1) if not p.strip()]
+    if failed:
+        raise RuntimeError(f"부분 요약 실패 ({len(failed)}/{len(chunks)}): {failed}")
+    partials = [p.strip() for p in partials]
+
     prompt = (
-        "다음은 한국어 뉴스 기사 본문입니다. 핵심 내용을 요약해 주세요.\n\n"
-        f"{body_text}"
+        "다음은 한 한국어 뉴스 기사를 부분별로 요약한 내용입니다. "
+        "전체 기사의 핵심 내용을 하나의 요약으로 정리해 주세요.\n\n"
+        + "\n".join(f"- {p}" for p in partials)
     )
+    return ask_summary(system_content, prompt, max_len, stream=stream, on_token=on_token)
+
+
+def summarize_article(
+    body_text: str,
+    max_len: int = 150,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+    long_threshold: int = LONG_ARTICLE_CHARS,
+) -> str:
+    """
+    뉴스 본문을 OpenAI API로 요약.
+    stream=True 이면 토큰이 도착할 때마다 on_token(조각)을 호출하고,
+    최종적으로 이어붙인 요약 문자열을 반환.
+    본문이 long_threshold 글자를 넘으면 summarize_long_article로 나눠서 요약.
+    """
+    if not isinstance(body_text, str) or not body_text.strip():
+        return ""
 
     try:
-        return my_openai.question(system_content, prompt)
+        if len(body_text) > long_threshold:
+            return summarize_long_article(body_text, max_len=max_len, stream=stream, on_token=on_token)
+
+        prompt = (
+            "다음은 한국어 뉴스 기사 본문입니다. 핵심 내용을 요약해 주세요.\n\n"
+            f"{body_text}"
+        )
+        return ask_summary(
+            build_summary_system_content(max_len), prompt, max_len, stream=stream, on_token=on_token
+        )
     except Exception as e:
         print(f"[ERROR] 요약 실패: {e}")
         return ""
@@ -196,14 +338,16 @@ def summarize_news_excel(
     time_column: str = "제공시간",
     max_len: int = 150,
     sleep_sec: float = 0.5,
+    stream: bool = True,
+    flush_sec: float = 5.0,
 ):
     """
     전체 파이프라인:
     - 제목 태그 제거
     - HTML 엔티티 디코딩
     - 제공시간 → YYYY-MM-DD
-    - 본문 요약 생성
-    - 엑셀로 저장
+    - 본문 요약 생성 (stream=True 면 요약이 생성되는 대로 화면에 출력)
+    - 엑셀로 저장 (진행 중에도 flush_sec 간격으로 부분 결과 저장)
     """
     df = pd.read_excel(input_path)
 
@@ -215,21 +359,56 @@ def summarize_news_excel(
     if time_column in df.columns:
         df[time_column] = df[time_column].astype(str).apply(convert_date)
 
-    # 본문 요약
-    summaries = []
+    # 본문 요약 (아직 요약되지 않은 행은 빈 값으로 두고 부분 저장)
+    df[summary_column] = ""
+    last_flush = None
+
+    def print_token(piece: str):
+        print(piece, end="", flush=True)
+
     for i, body in enumerate(df[text_column]):
         print(f"[INFO] {i+1}/{len(df)} 기사 요약 중…")
 
-        summary = summarize_article(str(body), max_len=max_len)
-        summaries.append(summary)
+        summary = summarize_article(
+            str(body),
+            max_len=max_len,
+            stream=stream,
+            on_token=print_token if stream else None,
+        )
+        if stream:
+            print()
+        df.at[df.index[i], summary_column] = summary
+
+        # 첫 결과는 바로, 이후에는 flush_sec 간격으로 부분 저장
+        # (엑셀로 열어둔 파일은 Windows에서 잠겨 있으므로 저장 실패는 건너뛰고 계속 진행)
+        now = time.monotonic()
+        if i + 1 < len(df) and (last_flush is None or now - last_flush >= flush_sec):
+            last_flush = now
+            try:
+                df.to_excel(output_path, index=False)
+                print(f"[INFO] 부분 저장 ({i+1}/{len(df)}) → {output_path}")
+            except OSError as e:
+                print(f"[WARN] 부분 저장 실패 (파일이 열려 있나요?): {output_path} / {e}")
 
         time.sleep(sleep_sec)
 
-    df[summary_column] = summaries
-
-    df.to_excel(output_path, index=False)
+    try:
+        df.to_excel(output_path, index=False)
+    except OSError as e:
+        # 최종 저장까지 막히면 요약을 잃지 않도록 다른 이름으로 저장
+        root, ext = os.path.splitext(output_path)
+        fallback_path = f"{root}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+        print(f"[WARN] 저장 실패: {output_path} / {e} → {fallback_path} 로 저장")
+        output_path = fallback_path
+        df.to_excel(output_path, index=False)
     print(f"[DONE] 처리된 엑셀 저장 완료 → {output_path}")
 
+    # 검색 인덱스 갱신 (요약)
+    try:
+        search_index.index_news(df, origin=output_path, prune=True)
+    except Exception as e:
+        print(f"[ERROR] 검색 인덱스 갱신 실패: {e}")
+
 def test():
     system_content = [
         "user의 질문에 최대한 친절하게 대답하세요",
@@ -0,0 +1,386 @@
+"""
+여러 검색어 뉴스 모니터링 (상시 실행 모드).
+
+설정 파일(news_queries.json)에 등록된 검색어들을 각자의 주기로
+네이버 뉴스 검색 API(sort=date)에 조회하고, 처음 보는 기사만
+본문 수집 → 요약 → 검색어별 CSV(news_store/<검색어>.csv)에 이어 붙인다.
+(CSV는 utf-8-sig 로 저장해 엑셀에서 바로 열 수 있음)
+
+- HTTP 연결 풀 하나를 모든 검색어가 공유
+- 네이버 검색 API 호출 수는 모든 검색어 합산으로 일일 한도(daily_limit) 이내로 제한
+- 여러 검색어에 동시에 걸린 기사도 요약은 한 번만 (링크 → 요약 캐시 공유)
+- 본문 수집/요약에 실패한 기사는 저장하지 않고 다음 조회 때 다시 시도
+  (MAX_ATTEMPTS 번 실패하면 포기)
+- 이미 처리한 기사 링크, 실패 횟수, 당일 호출 수는 state 파일에 주기적으로(state_save_sec)
+  저장되어 재시작해도 유지. 요약 캐시는 메모리에만 두고 시작할 때 CSV에서 다시 채움
+- 파일/색인 쓰기는 스레드에서 실행해 다른 검색어 작업을 막지 않음
+
+사용 예)
+    python 1.news_monitor.py --config news_queries.json
+    python 1.news_monitor.py --config news_queries.json --once
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+import search_index
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 1.news.py 는 파일명 때문에 import 문으로 불러올 수 없어서 직접 로드
+_spec = importlib.util.spec_from_file_location("news", os.path.join(BASE_DIR, "1.news.py"))
+news = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(news)
+
+NAVER_DAILY_LIMIT = 25000     # 네이버 검색 API 일일 호출 한도
+SEEN_LINKS_PER_QUERY = 5000   # 검색어별로 기억해 둘 최근 기사 링크 수
+SUMMARY_CACHE_SIZE = 20000    # 검색어 간 공유하는 링크 → 요약 캐시 크기 (실패 횟수 기록도 같은 크기)
+STATE_SAVE_SEC = 60           # state 파일 저장 주기
+MAX_ATTEMPTS = 3              # 본문 수집/요약 실패 시 재시도 횟수
+STORE_COLUMNS = ["제목", "링크", "제공시간", "뉴스본문", "요약", "수집시각"]
+
+
+class DailyQuota:
+    """
+    모든 검색어가 공유하는 API 일일 호출 한도.
+    날짜가 바뀌면 사용량을 0으로 초기화한다.
+    """
+
+    def __init__(self, limit: int, used: int = 0, day: Optional[str] = None):
+        self.limit = limit
+        self.used = used
+        self.day = day or date.today().isoformat()
+
+    def try_acquire(self) -> bool:
+        today = date.today().isoformat()
+        if today != self.day:
+            self.day, self.used = today, 0
+
+        if self.used >= self.limit:
+            return False
+
+        self.used += 1
+        return True
+
+    def to_dict(self) -> Dict:
+        return {"day": self.day, "used": self.used}
+
+
+class NewsMonitor:
+    """검색어별 폴링 작업을 asyncio로 동시에 돌리는 스케줄러."""
+
+    def __init__(self, config: Dict):
+        self.queries: List[Dict] = config["queries"]
+        self.store_dir: str = config.get("store_dir", "news_store")
+        self.state_path: str = config.get("state_path", os.path.join(self.store_dir, "state.json"))
+        self.max_len: int = config.get("max_len", 150)
+        self.max_connections: int = config.get("max_connections", 10)
+        self.summary_workers: int = config.get("summary_workers", 2)
+        self.state_save_sec: float = config.get("state_save_sec", STATE_SAVE_SEC)
+
+        state = self.load_state()
+        quota = state.get("quota", {})
+        self.quota = DailyQuota(
+            config.get("daily_limit", NAVER_DAILY_LIMIT),
+            used=quota.get("used", 0),
+            day=quota.get("day"),
+        )
+        self.seen: Dict[str, List[str]] = state.get("seen", {})
+        self.failures: Dict[str, int] = state.get("failures", {})
+        self.summaries: Dict[str, str] = self.load_summaries()
+
+        # 주기 저장과 종료 시 저장이 겹치지 않도록
+        self.state_lock = threading.Lock()
+
+        # 여러 검색어가 같은 기사를 동시에 처리할 때 한 작업만 돌도록
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+        # 모든 검색어가 공유하는 HTTP 연결 풀
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_connections, pool_maxsize=self.max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.http_slots: Optional[asyncio.Semaphore] = None
+        self.summary_slots: Optional[asyncio.Semaphore] = None
+        self.write_lock: Optional[asyncio.Lock] = None
+
+    def load_state(self) -> Dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def load_summaries(self) -> Dict[str, str]:
+        """검색어별 CSV에 이미 저장된 요약으로 링크 → 요약 캐시를 채움 (최근 것 우선)."""
+        summaries: Dict[str, str] = {}
+        for spec in self.queries:
+            path = self.store_path(spec["query"])
+            if not os.path.exists(path):
+                continue
+            try:
+                df = pd.read_csv(path, usecols=["링크", "요약"], encoding="utf-8-sig")
+            except Exception as e:
+                print(f"[WARN] 저장된 요약을 읽지 못했습니다: {path} / {e}")
+                continue
+            for link, summary in zip(df["링크"], df["요약"]):
+                if isinstance(link, str) and isinstance(summary, str) and summary:
+                    summaries.pop(link, None)
+                    summaries[link] = summary
+
+        for link in list(summaries)[:-SUMMARY_CACHE_SIZE]:
+            del summaries[link]
+        return summaries
+
+    def snapshot_state(self) -> Dict:
+        """
+        저장할 상태를 복사해 둔다. 파일 쓰기는 스레드에서 하므로
+        이벤트 루프가 그 사이 dict를 바꿔도 영향이 없도록 함.
+        """
+        for cache in (self.summaries, self.failures):
+            for link in list(cache)[:-SUMMARY_CACHE_SIZE]:
+                del cache[link]
+
+        return {
+            "quota": self.quota.to_dict(),
+            "seen": {q: list(links) for q, links in self.seen.items()},
+            "failures": dict(self.failures),
+        }
+
+    def save_state(self, state: Dict):
+        with self.state_lock:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_path)
+
+    async def save_state_periodically(self):
+        """state_save_sec 마다 상태 저장 (조회마다 쓰지 않음)."""
+        while True:
+            await asyncio.sleep(self.state_save_sec)
+            try:
+                await asyncio.to_thread(self.save_state, self.snapshot_state())
+            except OSError as e:
+                print(f"[ERROR] 상태 저장 실패: {e}")
+
+    def check_schedule(self):
+        """등록된 주기대로 돌렸을 때 하루 예상 호출 수가 한도를 넘는지 확인."""
+        planned = sum(86400 / max(q.get("interval_sec", 600), 1) for q in self.queries)
+        if planned > self.quota.limit:
+            print(
+                f"[WARN] 예상 일일 호출 {int(planned)}회가 한도 {self.quota.limit}회를 넘습니다. "
+                "한도 도달 후에는 다음 날까지 조회를 건너뜁니다."
+            )
+
+    def store_path(self, query: str) -> str:
+        safe = re.sub(r'[\\/:*?"<>|\s]+', "_", query).strip("_") or "query"
+        return os.path.join(self.store_dir, f"{safe}.csv")
+
+    async def http_get(self, url: str, **kwargs) -> requests.Response:
+        """공유 세션으로 GET 요청. 동시 요청 수는 max_connections로 제한."""
+        async with self.http_slots:
+            return await asyncio.to_thread(self.session.get, url, timeout=10, **kwargs)
+
+    async def search(self, query: str, display: int) -> Optional[List[Dict]]:
+        if not self.quota.try_acquire():
+            print(f"[WARN] 네이버 API 일일 한도 도달 ({self.quota.used}/{self.quota.limit}) → '{query}' 건너뜀")
+            return None
+
+        params = {"query": query, "display": display, "start": 1, "sort": "date"}
+        headers = {
+            "X-Naver-Client-Id": news.client_id,
+            "X-Naver-Client-Secret": news.client_secret,
+        }
+        try:
+            res = await self.http_get(news.NAVER_NEWS_URL, params=params, headers=headers)
+        except requests.RequestException as e:
+            print(f"[ERROR] 검색 요청 실패: '{query}' / {e}")
+            return None
+
+        if res.status_code != 200:
+            print(f"[ERROR] 검색 응답 코드: '{query}' / {res.status_code}")
+            return None
+
+        return res.json().get("items", [])
+
+    async def fetch_body(self, link: str) -> Optional[str]:
+        try:
+            res = await self.http_get(link, headers=news.ARTICLE_HEADERS)
+        except requests.RequestException as e:
+            print(f"[ERROR] 기사 요청 실패: {link} / {e}")
+            return None
+
+        if res.status_code != 200:
+            print(f"[ERROR] 기사 응답 코드: {link} / {res.status_code}")
+            return None
+
+        return news.parse_article_body(res.text)
+
+    async def fetch_and_summarize(self, link: str) -> Optional[Tuple[str, str]]:
+        """본문 수집 + 요약. 실패하면 실패 횟수를 1 올리고 None."""
+        body = await self.fetch_body(link)
+
+        summary = self.summaries.get(link)
+        if body and not summary:
+            # 요약은 동기 함수라 스레드에서 실행, 동시 요약 수는 summary_workers로 제한
+            async with self.summary_slots:
+                summary = await asyncio.to_thread(news.summarize_article, body, self.max_len)
+
+        if not body or not summary:
+            self.failures[link] = self.failures.get(link, 0) + 1
+            return None
+
+        self.summaries[link] = summary
+        self.failures.pop(link, None)
+        return body, summary
+
+    async def get_article(self, link: str) -> Optional[Tuple[str, str]]:
+        """
+        (본문, 요약) 반환, 실패 시 None.
+        다른 검색어가 같은 기사를 처리 중이면 그 결과를 기다려서 같이 쓴다.
+        """
+        if link not in self.inflight:
+            self.inflight[link] = asyncio.ensure_future(self.fetch_and_summarize(link))
+        task = self.inflight[link]
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                self.inflight.pop(link, None)
+
+    async def process_item(self, item: Dict) -> Optional[List]:
+        link = item["link"]
+        article = await self.get_article(link)
+        if article is None:
+            return None
+
+        body, summary = article
+        return [
+            news.clean_title(item["title"]),
+            link,
+            news.convert_date(item["pubDate"]),
+            body,
+            summary,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        ]
+
+    def append_to_store(self, query: str, rows: List[List]):
+        """검색어별 CSV 끝에 새 행만 추가하고, 새 기사 요약을 색인."""
+        path = self.store_path(query)
+        df = pd.DataFrame(rows, columns=STORE_COLUMNS)
+        write_header = not os.path.exists(path)
+        df.to_csv(path, mode="a", header=write_header, index=False,
+                  encoding="utf-8-sig" if write_header else "utf-8")
+
+        # 검색 인덱스 갱신 (새로 들어온 기사 요약만)
+        try:
+            search_index.index_news(df, origin=path)
+        except Exception as e:
+            print(f"[ERROR] 검색 인덱스 갱신 실패: {e}")
+
+    async def poll(self, spec: Dict) -> int:
+        """검색어 하나를 한 번 조회해 새 기사만 처리. 추가된 기사 수 반환."""
+        query = spec["query"]
+        items = await self.search(query, spec.get("display", 100))
+        if items is None:
+            return 0
+
+        seen = self.seen.setdefault(query, [])
+        seen_set = set(seen)
+        new_items = [it for it in items if it["link"] not in seen_set]
+
+        # 네이버 뉴스 본문 구조를 가진 기사만 수집 (1.news.py와 동일)
+        # 재시도 한도를 넘긴 기사는 다시 받지 않음
+        targets = [
+            it for it in new_items
+            if "naver" in it["link"] and self.failures.get(it["link"], 0) < MAX_ATTEMPTS
+        ]
+        results = await asyncio.gather(*(self.process_item(it) for it in targets))
+        rows = [row for row in results if row]
+
+        # 파일/색인 쓰기는 스레드에서, 쓰기끼리는 순서대로
+        if rows:
+            async with self.write_lock:
+                await asyncio.to_thread(self.append_to_store, query, rows)
+
+        # 처리에 성공했거나, 수집 대상이 아니거나, 재시도 한도를 넘긴 기사만 본 것으로 기록
+        # (CSV에 쓴 뒤에 기록해야 저장 전에 상태가 먼저 저장되는 일이 없음)
+        done = {row[1] for row in rows}
+        for it in new_items:
+            link = it["link"]
+            if link in done or "naver" not in link:
+                seen.append(link)
+            elif self.failures.get(link, 0) >= MAX_ATTEMPTS:
+                print(f"[WARN] {MAX_ATTEMPTS}회 실패, 건너뜀: {link}")
+                seen.append(link)
+        del seen[:-SEEN_LINKS_PER_QUERY]
+
+        retry = len(targets) - len(rows) - sum(
+            1 for it in targets if self.failures.get(it["link"], 0) >= MAX_ATTEMPTS
+        )
+        print(
+            f"[INFO] '{query}': 새 기사 {len(rows)}건 저장"
+            + (f", {retry}건 다음 조회 때 재시도" if retry else "")
+            + f" (API {self.quota.used}/{self.quota.limit})"
+        )
+        return len(rows)
+
+    async def run_query(self, spec: Dict, once: bool = False):
+        interval = spec.get("interval_sec", 600)
+        while True:
+            try:
+                await self.poll(spec)
+            except Exception as e:
+                print(f"[ERROR] '{spec['query']}' 처리 실패: {e}")
+            if once:
+                return
+            await asyncio.sleep(interval)
+
+    async def run(self, once: bool = False):
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.check_schedule()
+
+        self.http_slots = asyncio.Semaphore(self.max_connections)
+        self.summary_slots = asyncio.Semaphore(self.summary_workers)
+        self.write_lock = asyncio.Lock()
+        saver = asyncio.ensure_future(self.save_state_periodically())
+        try:
+            await asyncio.gather(*(self.run_query(spec, once=once) for spec in self.queries))
+        finally:
+            saver.cancel()
+            self.save_state(self.snapshot_state())
+            self.session.close()
+
+
+def load_config(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    if not config.get("queries"):
+        raise ValueError(f"설정 파일에 queries 항목이 없습니다: {path}")
+
+    return config
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여러 검색어 뉴스 모니터링")
+    parser.add_argument("--config", default="news_queries.json", help="검색어 설정 파일")
+    parser.add_argument("--once", action="store_true", help="모든 검색어를 한 번씩만 조회하고 종료")
+    args = parser.parse_args()
+
+    monitor = NewsMonitor(load_config(args.config))
+    try:
+        asyncio.run(monitor.run(once=args.once))
+    except KeyboardInterrupt:
+        print("[DONE] 모니터링 종료")
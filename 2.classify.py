@@ -1,7 +1,8 @@
 import pandas as pd
-import time
-from typing import List, Optional
+import time, re, hashlib, unicodedata, zlib
+from typing import Dict, List, Optional, Tuple
 import my_openai  # 네가 이미 사용 중인 래퍼 모듈
+import search_index
 
 
 # 1. 카테고리 정의 (번호 + 라벨)
@@ -90,6 +91,144 @@ def classify_topic_for_row(title: str, abstract: str, project_title: str) -> Opt
     return TOPIC_MAP["6"]
 
 
+# 2. 중복/유사 논문 묶기 (같은 입력은 한 번만 분류)
+MINHASH_PERM = 64      # MinHash 해시 함수 개수
+MINHASH_BANDS = 16     # LSH 밴드 수 (밴드당 4행)
+MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_PARAMS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % MINHASH_PRIME | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % MINHASH_PRIME,
+    )
+    for i in range(MINHASH_PERM)
+]
+
+
+def normalize_text(text: str) -> str:
+    """
+    비교용 정규화: 유니코드 NFKC, 소문자, 문장부호 제거, 공백 정리.
+    엑셀 결측값이 문자열로 들어온 'nan'은 빈 문자열로 본다.
+    """
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return "" if text == "nan" else text
+
+
+def text_hash(*parts: str) -> str:
+    """정규화된 텍스트 묶음의 해시 (정확 중복 판정용)."""
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def minhash_signature(text: str, shingle_size: int = 3) -> Tuple[int, ...]:
+    """단어 n-gram 집합에 대한 MinHash 시그니처."""
+    words = text.split()
+    if len(words) <= shingle_size:
+        shingles = {text}
+    else:
+        shingles = {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+    hashes = [zlib.crc32(sh.encode("utf-8")) for sh in shingles]
+    return tuple(
+        min((a * h + b) % MINHASH_PRIME for h in hashes)
+        for a, b in _MINHASH_PARAMS
+    )
+
+
+def minhash_similarity(sig1: Tuple[int, ...], sig2: Tuple[int, ...]) -> float:
+    """두 시그니처로 추정한 Jaccard 유사도."""
+    return sum(x == y for x, y in zip(sig1, sig2)) / len(sig1)
+
+
+def group_duplicate_rows(
+    records: List[Tuple[str, str, str]],
+    near_dup_threshold: float = 0.9,
+) -> Tuple[List[List[int]], Dict[str, int]]:
+    """
+    (제목, 초록, 과제명) 목록을 받아 같은 분류 결과를 공유할 행 묶음을 만든다.
+    - 정확 중복: 세 값을 정규화한 해시가 같은 행
+    - 초록 중복: 정규화한 초록 해시가 같은 행
+    - 유사 중복: 초록 MinHash 추정 유사도가 near_dup_threshold 이상인 행
+      (프리프린트/저널 버전, 연도만 다른 중복 DOI 등)
+    반환: (행 번호 묶음 리스트, 통계 dict)
+    """
+    parent = list(range(len(records)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> bool:
+        ri, rj = find(i), find(j)
+        if ri == rj:
+            return False
+        parent[max(ri, rj)] = min(ri, rj)
+        return True
+
+    # 정확 중복
+    exact_first: Dict[str, int] = {}
+    abstract_first: Dict[str, int] = {}
+    exact_dups = 0
+    for i, (title, abstract, project_title) in enumerate(records):
+        key = text_hash(normalize_text(title), normalize_text(abstract), normalize_text(project_title))
+        if key in exact_first:
+            union(exact_first[key], i)
+            exact_dups += 1
+        else:
+            exact_first[key] = i
+
+        norm_abstract = normalize_text(abstract)
+        if norm_abstract:
+            abstract_first.setdefault(text_hash(norm_abstract), i)
+
+    # 유사 중복: 서로 다른 초록만 MinHash + LSH 밴딩으로 후보를 찾은 뒤 유사도 확인
+    signatures: Dict[int, Tuple[int, ...]] = {}
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    rows_per_band = MINHASH_PERM // MINHASH_BANDS
+    for i in abstract_first.values():
+        sig = minhash_signature(normalize_text(records[i][1]))
+        signatures[i] = sig
+        for band in range(MINHASH_BANDS):
+            chunk = sig[band * rows_per_band:(band + 1) * rows_per_band]
+            buckets.setdefault((band, chunk), []).append(i)
+
+    # 초록이 똑같은 행(제목/과제명만 다른 경우)은 대표 행과 묶는다
+    abstract_dups = 0
+    for i, (_, abstract, _) in enumerate(records):
+        norm_abstract = normalize_text(abstract)
+        if norm_abstract and union(abstract_first[text_hash(norm_abstract)], i):
+            abstract_dups += 1
+
+    near_dups = 0
+    checked = set()
+    for members in buckets.values():
+        for a_pos, i in enumerate(members):
+            for j in members[a_pos + 1:]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if minhash_similarity(signatures[i], signatures[j]) >= near_dup_threshold:
+                    if union(i, j):
+                        near_dups += 1
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(records)):
+        groups.setdefault(find(i), []).append(i)
+
+    stats = {
+        "rows": len(records),
+        "groups": len(groups),
+        "exact_dups": exact_dups,
+        "abstract_dups": abstract_dups,
+        "near_dups": near_dups,
+    }
+    return list(groups.values()), stats
+
+
 def tag_papers_by_topic(
     input_path: str,
     output_path: str,
@@ -98,10 +237,12 @@ def tag_papers_by_topic(
     project_title_col: str = "과제명(국문)",
     tag_col: str = "연구주제태그",
     sleep_sec: float = 0.5,
+    dedup: bool = True,
+    near_dup_threshold: float = 0.9,
 ):
     """
     1) 엑셀 로드
-    2) 각 논문(행)별로 OpenAI 분류
+    2) 중복/유사 논문을 묶어서 묶음별로 한 번만 OpenAI 분류 (dedup=False면 행별 분류)
     3) tag_col 컬럼에 태그(예: '1. 동물대체시험기술 개발') 기록
     4) 결과를 새로운 엑셀로 저장
     """
@@ -110,19 +251,35 @@ def tag_papers_by_topic(
     # 기존 태그 컬럼이 있으면 덮어쓰기
     df[tag_col] = ""
 
-    for idx, row in df.iterrows():
+    records = []
+    for _, row in df.iterrows():
         title = str(row.get(title_col, "") or "").strip()
         abstract = str(row.get(abstract_col, "") or "").strip()
         project_title = str(row.get(project_title_col, "") or "").strip()
+        records.append((title, abstract, project_title))
+
+    if dedup:
+        groups, stats = group_duplicate_rows(records, near_dup_threshold=near_dup_threshold)
+        print(
+            f"[DEDUP] {stats['rows']}행 → {stats['groups']}개 묶음 "
+            f"(정확 중복 {stats['exact_dups']}행, 초록 중복 {stats['abstract_dups']}행, 유사 중복 {stats['near_dups']}행, "
+            f"OpenAI 호출 {stats['rows'] - stats['groups']}회 절감)"
+        )
+    else:
+        groups = [[i] for i in range(len(records))]
 
-        print(f"[{idx+1}/{len(df)}] 분류 중: {title[:60]}...")
+    for g, members in enumerate(groups):
+        title, abstract, project_title = records[members[0]]
+
+        print(f"[{g+1}/{len(groups)}] 분류 중 ({len(members)}행): {title[:60]}...")
 
         tag = classify_topic_for_row(title, abstract, project_title)
 
         if tag is None:
             tag = TOPIC_MAP["6"]  # 실패 시 기타
 
-        df.at[idx, tag_col] = tag
+        for i in members:
+            df.at[df.index[i], tag_col] = tag
 
         # 호출 간 간격 (rate limit 대비)
         time.sleep(sleep_sec)
@@ -130,6 +287,12 @@ def tag_papers_by_topic(
     df.to_excel(output_path, index=False)
     print(f"[DONE] 저장 완료 → {output_path}")
 
+    # 검색 인덱스 갱신 (초록)
+    try:
+        search_index.index_papers(df, origin=output_path, prune=True)
+    except Exception as e:
+        print(f"[ERROR] 검색 인덱스 갱신 실패: {e}")
+
 
 if __name__ == "__main__":
     # 실제 실행 예시
@@ -1,35 +1,15 @@
 import pandas as pd
 import time, os
 import requests
+import search_index
+from search_index import normalize_doi
 from typing import Optional, Dict, Any
-from urllib.parse import urlparse
 
 API_KEY = os.environ.get("ELSEVIER_API_KEY")
 INST_TOKEN = None                      # 기관 토큰 있으면 입력, 없으면 None
 
 ABSTRACT_BASE_URL = "https://api.elsevier.com/content/abstract"
 
-def normalize_doi(raw: str) -> str:
-    """
-    엑셀에서 읽은 DOI 문자열을
-    - 순수 DOI만 남기도록 정규화.
-    예) 'https://doi.org/10.1016/j.cej.2023.145834'
-        → '10.1016/j.cej.2023.145834'
-    """
-    if not isinstance(raw, str):
-        return ""
-
-    doi = raw.strip()
-
-    # URL 형식인 경우 처리
-    if doi.lower().startswith("http"):
-        parsed = urlparse(doi)
-        # path 부분 (/10.1016/...) 에서 / 제거
-        doi = parsed.path.lstrip("/")
-
-    # 앞뒤 공백/따옴표 같은 거 제거
-    return doi.strip()
-
 def extract_abstract_from_response(data: Dict[str, Any]) -> str:
     resp = data.get("abstracts-retrieval-response", {})
     
@@ -126,6 +106,12 @@ def enrich_excel_abstracts_doi_only(
     df.to_excel(output_path, index=False)
     print(f"\n[DONE] Save Complete → {output_path}")
 
+    # 검색 인덱스 갱신 (초록)
+    try:
+        search_index.index_papers(df, origin=output_path, prune=True)
+    except Exception as e:
+        print(f"[ERROR] 검색 인덱스 갱신 실패: {e}")
+
 
 if __name__ == "__main__":
     enrich_excel_abstracts_doi_only(
@@ -5,6 +5,7 @@ from typing import List, Dict
 import pandas as pd
 
 from my_openai import question  # 사용자가 만든 함수: question(system_content, prompt)
+import search_index
 
 
 FOLDER_PATH = "agenda"
@@ -144,6 +145,12 @@ def main():
     df.to_excel(OUTPUT_EXCEL, index=False)
     print(f"총 {len(all_rows)}개 안건을 '{OUTPUT_EXCEL}' 파일로 저장했습니다.")
 
+    # 검색 인덱스 갱신 (안건 title/result)
+    try:
+        search_index.index_agenda(df, origin=OUTPUT_EXCEL, prune=True)
+    except Exception as e:
+        print(f"[ERROR] 검색 인덱스 갱신 실패: {e}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,507 @@
+"""
+오프라인 벤치마크 스크립트.
+
+OpenAI / Elsevier / 네이버 API 없이 파이프라인 성능을 측정하기 위해
+bench_fixtures/ 에 저장된 응답을 로컬 서버에서 그대로 재생한다.
+
+- 네이버 뉴스 검색 JSON, 기사 HTML
+- Elsevier abstract JSON
+- OpenAI chat completions (인위적인 지연시간 설정 가능, stream=True 지원)
+
+사용 예)
+    python bench.py --rows 300 --latency 0.05
+    python bench.py --stages classify,news --json bench_result.json
+    python bench.py --baseline bench_result.json --tolerance 0.2
+    python bench.py --stages classify --rows 900 --no-dedup   # 행마다 분류 호출
+
+분류 단계는 기본적으로 중복 논문을 묶어 한 번만 호출하므로(dedup),
+입력 행을 반복해서 늘리면 호출 수는 늘지 않는다. 그래서 rows/s 외에
+llm_calls(실제 chat completion 호출 수)와 calls/s를 함께 기록하고,
+dedup 설정이 다른 결과끼리는 비교하지 않는다.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BASE_DIR, "bench_fixtures")
+
+STAGES = ["classify", "abstract", "news", "agenda", "crawl"]
+
+
+def load_fixtures(fixture_dir: str = FIXTURE_DIR) -> Dict[str, object]:
+    """녹화된 응답 파일들을 읽어 dict로 반환."""
+
+    def read(name: str) -> str:
+        with open(os.path.join(fixture_dir, name), encoding="utf-8") as f:
+            return f.read()
+
+    return {
+        "naver_search": json.loads(read("naver_news_search.json")),
+        "naver_article": read("naver_article.html"),
+        "elsevier_abstract": json.loads(read("elsevier_abstract.json")),
+        "chat": json.loads(read("chat_responses.json")),
+    }
+
+
+def pick_chat_reply(chat: Dict[str, str], messages: List[Dict]) -> str:
+    """
+    system 메시지 내용을 보고 어떤 파이프라인의 호출인지 판단해
+    녹화된 답변을 고른다.
+    """
+    system = ""
+    for m in messages:
+        if m.get("role") == "system":
+            system = str(m.get("content", ""))
+            break
+
+    if "분류" in system:
+        return chat["classify"]
+    if "안건" in system:
+        return chat["agenda"]
+    return chat["summary"]
+
+
+class _FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # 요청마다 찍히는 접근 로그는 측정에 방해되므로 끈다
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server: "FakeApiServer" = self.server.owner
+        parsed = urlparse(self.path)
+        path = parsed.path
+
+        if path == "/v1/search/news.json":
+            server.count("naver_search")
+            server.delay(server.http_latency)
+            qs = parse_qs(parsed.query)
+            self._send(200, json.dumps(server.search_response(qs), ensure_ascii=False),
+                       "application/json; charset=utf-8")
+        elif path.startswith("/naver/mnews/article/"):
+            server.count("naver_article")
+            server.delay(server.http_latency)
+            self._send(200, server.fixtures["naver_article"], "text/html; charset=utf-8")
+        elif path.startswith("/content/abstract/doi/"):
+            server.count("elsevier_abstract")
+            server.delay(server.http_latency)
+            self._send(200, json.dumps(server.fixtures["elsevier_abstract"], ensure_ascii=False),
+                       "application/json; charset=utf-8")
+        else:
+            self._send(404, "{}", "application/json")
+
+    def do_POST(self):
+        server: "FakeApiServer" = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if urlparse(self.path).path != "/v1/chat/completions":
+            self._send(404, "{}", "application/json")
+            return
+
+        server.count("chat_completions")
+        server.delay(server.latency)
+        content = pick_chat_reply(server.fixtures["chat"], payload.get("messages", []))
+
+        # 실제 API처럼 max_tokens에서 생성을 끊는다 (글자 1개 = 토큰 1개로 근사)
+        finish_reason = "stop"
+        max_tokens = payload.get("max_tokens")
+        if max_tokens and len(content) > max_tokens:
+            content, finish_reason = content[:max_tokens], "length"
+
+        if payload.get("stream"):
+            self._stream(server, payload, content, finish_reason)
+            return
+
+        self._send(200, json.dumps(server.chat_response(payload, content, finish_reason),
+                                   ensure_ascii=False), "application/json")
+
+    def _stream(self, server: "FakeApiServer", payload: Dict, content: str, finish_reason: str):
+        """server-sent events 형식으로 답변을 조각내어 전송."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        size = server.stream_chunk_chars
+        pieces = [content[i:i + size] for i in range(0, len(content), size)]
+        for n, piece in enumerate(pieces):
+            if n:
+                server.delay(server.token_latency)
+            self._write_event(server.chat_chunk(payload, {"content": piece}, None))
+        self._write_event(server.chat_chunk(payload, {}, finish_reason))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _write_event(self, data: Dict):
+        self.wfile.write(f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+class FakeApiServer:
+    """
+    네이버 검색/기사, Elsevier abstract, OpenAI chat completions 를
+    흉내내는 로컬 HTTP 서버. 백그라운드 스레드에서 동작한다.
+    """
+
+    def __init__(
+        self,
+        fixtures: Dict[str, object],
+        latency: float = 0.0,
+        http_latency: float = 0.0,
+        token_latency: float = 0.0,
+        stream_chunk_chars: int = 4,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.http_latency = http_latency
+        self.token_latency = token_latency
+        self.stream_chunk_chars = stream_chunk_chars
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _FakeApiHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def count(self, key: str):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def reset_counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+    @staticmethod
+    def delay(sec: float):
+        if sec > 0:
+            time.sleep(sec)
+
+    def search_response(self, qs: Dict[str, List[str]]) -> Dict:
+        """녹화된 검색 결과의 기사 링크를 로컬 서버 주소로 바꿔서 반환."""
+        recorded = self.fixtures["naver_search"]
+        display = int(qs.get("display", ["10"])[0])
+        start = int(qs.get("start", ["1"])[0])
+
+        items = []
+        for i, item in enumerate(recorded["items"][:display]):
+            item = dict(item)
+            item["link"] = f"{self.base_url}/naver/mnews/article/{start + i:010d}"
+            items.append(item)
+
+        return dict(recorded, start=start, display=len(items), items=items)
+
+    @staticmethod
+    def chat_chunk(payload: Dict, delta: Dict, finish_reason: Optional[str]) -> Dict:
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    @staticmethod
+    def chat_response(payload: Dict, content: str, finish_reason: str = "stop") -> Dict:
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-4o"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+
+def load_script(filename: str, module_name: str):
+    """'2.classify.py' 처럼 import 할 수 없는 파일명을 모듈로 불러온다."""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(BASE_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def scale_frame(df: pd.DataFrame, rows: int) -> pd.DataFrame:
+    """행을 반복해서 rows 개로 늘리거나 잘라낸다."""
+    if df.empty:
+        return df
+    repeat = -(-rows // len(df))
+    return pd.concat([df] * repeat, ignore_index=True).iloc[:rows].reset_index(drop=True)
+
+
+def build_inputs(workdir: str, rows: int, pdfs: int) -> Dict[str, str]:
+    """저장소의 엑셀/PDF를 rows 배수로 불려서 workdir에 입력 파일 생성."""
+    paths = {}
+
+    papers = pd.read_excel(os.path.join(BASE_DIR, "2.NTIS_PAPER_with_abstract(DOI_only).xlsx"))
+    paths["classify"] = os.path.join(workdir, "papers_with_abstract.xlsx")
+    scale_frame(papers, rows).to_excel(paths["classify"], index=False)
+
+    # NTIS 원본은 첫 행이 '검색결과', 두 번째 행이 실제 컬럼명인 구조라 그대로 유지
+    raw = pd.read_excel(os.path.join(BASE_DIR, "2.NTIS_PI_0021912_PAPER_2025-11-18.xlsx"))
+    scaled = pd.concat([raw.iloc[:1], scale_frame(raw.iloc[1:], rows)], ignore_index=True)
+    paths["abstract"] = os.path.join(workdir, "ntis_raw.xlsx")
+    scaled.to_excel(paths["abstract"], index=False)
+
+    news = pd.read_excel(os.path.join(BASE_DIR, "news_data.xlsx"))
+    paths["news"] = os.path.join(workdir, "news_data.xlsx")
+    scale_frame(news, rows).to_excel(paths["news"], index=False)
+
+    agenda_src = os.path.join(BASE_DIR, "agenda")
+    agenda_dir = os.path.join(workdir, "agenda")
+    os.makedirs(agenda_dir, exist_ok=True)
+    sources = sorted(f for f in os.listdir(agenda_src) if f.lower().endswith(".pdf"))
+    for i in range(pdfs if sources else 0):
+        name = sources[i % len(sources)]
+        shutil.copyfile(os.path.join(agenda_src, name), os.path.join(agenda_dir, f"{i:04d}_{name}"))
+    paths["agenda"] = agenda_dir
+
+    return paths
+
+
+def run_stage(
+    name: str,
+    fn: Callable[[], int],
+    server: FakeApiServer,
+    trace_memory: bool = True,
+    verbose: bool = False,
+    options: Optional[Dict] = None,
+) -> Dict:
+    """한 단계를 실행하고 처리량/메모리/요청 수를 측정."""
+    server.reset_counts()
+    if trace_memory:
+        tracemalloc.start()
+
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    t0 = time.perf_counter()
+    with sink:
+        rows = fn()
+    elapsed = time.perf_counter() - t0
+
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    requests = server.reset_counts()
+    llm_calls = requests.get("chat_completions", 0)
+    return {
+        "stage": name,
+        "options": options or {},
+        "rows": rows,
+        "llm_calls": llm_calls,
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(rows / elapsed, 3) if elapsed > 0 else 0.0,
+        "calls_per_sec": round(llm_calls / elapsed, 3) if elapsed > 0 else 0.0,
+        "peak_mem_mb": round(peak / 1024 / 1024, 2),
+        "requests": requests,
+    }
+
+
+def compare_with_baseline(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """
+    기준 결과 대비 처리량 감소/메모리 증가가 tolerance를 넘는 단계를 찾는다.
+    입력 행 수나 옵션(dedup 등)이 다르면 처리량이 같은 의미가 아니므로 건너뛴다.
+    """
+    base = {r["stage"]: r for r in baseline}
+    problems = []
+    for r in results:
+        b = base.get(r["stage"])
+        if not b:
+            continue
+        if b["rows"] != r["rows"] or b.get("options", {}) != r.get("options", {}):
+            print(f"[WARN] {r['stage']}: 기준과 행 수/옵션이 달라 비교하지 않음")
+            continue
+        if b["rows_per_sec"] and r["rows_per_sec"] < b["rows_per_sec"] * (1 - tolerance):
+            problems.append(
+                f"{r['stage']}: 처리량 {b['rows_per_sec']} → {r['rows_per_sec']} rows/s"
+            )
+        if b["peak_mem_mb"] and r["peak_mem_mb"] > b["peak_mem_mb"] * (1 + tolerance):
+            problems.append(
+                f"{r['stage']}: 메모리 {b['peak_mem_mb']} → {r['peak_mem_mb']} MB"
+            )
+    return problems
+
+
+def print_report(results: List[Dict]):
+    print(
+        f"{'stage':<10}{'rows':>8}{'calls':>8}{'sec':>10}{'rows/s':>10}"
+        f"{'calls/s':>10}{'peak MB':>10}  requests"
+    )
+    for r in results:
+        reqs = ", ".join(f"{k}={v}" for k, v in sorted(r["requests"].items()))
+        opts = ", ".join(f"{k}={v}" for k, v in sorted(r["options"].items()))
+        print(
+            f"{r['stage']:<10}{r['rows']:>8}{r['llm_calls']:>8}{r['seconds']:>10.2f}"
+            f"{r['rows_per_sec']:>10.2f}{r['calls_per_sec']:>10.2f}{r['peak_mem_mb']:>10.2f}"
+            f"  {reqs}" + (f" [{opts}]" if opts else "")
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="오프라인 파이프라인 벤치마크")
+    parser.add_argument("--rows", type=int, default=100, help="엑셀 입력 행 수")
+    parser.add_argument("--pdfs", type=int, default=7, help="안건 PDF 개수")
+    parser.add_argument("--latency", type=float, default=0.0, help="chat completion 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="스트리밍 조각 간 지연(초)")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="네이버/Elsevier 응답 지연(초)")
+    parser.add_argument("--stages", default=",".join(STAGES), help="실행할 단계 (쉼표 구분)")
+    parser.add_argument("--no-trace-memory", action="store_true", help="tracemalloc 측정 끄기")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 성능 저하 비율")
+    parser.add_argument("--no-dedup", action="store_true", help="분류 단계에서 중복 묶음 없이 행마다 호출")
+    parser.add_argument("--verbose", action="store_true", help="파이프라인 출력 표시")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    server = FakeApiServer(
+        load_fixtures(),
+        latency=args.latency,
+        http_latency=args.http_latency,
+        token_latency=args.token_latency,
+    )
+    server.start()
+
+    # 파이프라인 모듈은 import 시점에 환경변수를 읽으므로 로드 전에 설정
+    os.environ.update({
+        "OPENAI_API_KEY_KIT": "bench",
+        "OPENAI_BASE_URL": f"{server.base_url}/v1",
+        "NAVER_API_CLIENT_ID": "bench",
+        "NAVER_API_CLIENT_SECRET": "bench",
+        "ELSEVIER_API_KEY": "bench",
+        "NO_PROXY": "127.0.0.1,localhost",
+    })
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    cwd = os.getcwd()
+    results = []
+    try:
+        print(f"[INFO] 입력 생성 중 → {workdir}")
+        paths = build_inputs(workdir, args.rows, args.pdfs)
+        os.chdir(workdir)
+
+        def classify() -> int:
+            mod = load_script("2.classify.py", "bench_classify")
+            mod.tag_papers_by_topic(
+                paths["classify"], "out_classify.xlsx", sleep_sec=0, dedup=not args.no_dedup
+            )
+            return args.rows
+
+        def abstract() -> int:
+            mod = load_script("2.get_abstract.py", "bench_get_abstract")
+            mod.ABSTRACT_BASE_URL = f"{server.base_url}/content/abstract"
+            mod.enrich_excel_abstracts_doi_only(paths["abstract"], "out_abstract.xlsx", sleep_sec=0)
+            return args.rows
+
+        def news() -> int:
+            mod = load_script("1.news.py", "bench_news")
+            mod.summarize_news_excel(paths["news"], "out_news.xlsx", sleep_sec=0)
+            return args.rows
+
+        def agenda() -> int:
+            mod = load_script("3.agenda.py", "bench_agenda")
+            mod.FOLDER_PATH = paths["agenda"]
+            mod.OUTPUT_EXCEL = "out_agenda.xlsx"
+            mod.main()
+            return len(os.listdir(paths["agenda"]))
+
+        def crawl() -> int:
+            mod = load_script("1.news.py", "bench_news_crawl")
+            mod.NAVER_NEWS_URL = f"{server.base_url}/v1/search/news.json"
+            mod.news_crawling_to_excel("PBS 폐지")
+            return len(pd.read_excel("news_data.xlsx"))
+
+        runners = {"classify": classify, "abstract": abstract, "news": news,
+                   "agenda": agenda, "crawl": crawl}
+
+        # 결과 해석/기준 비교에 영향을 주는 단계별 옵션
+        stage_options = {"classify": {"dedup": not args.no_dedup}}
+
+        for name in stages:
+            print(f"[INFO] {name} 실행 중…")
+            results.append(run_stage(
+                name, runners[name], server,
+                trace_memory=not args.no_trace_memory, verbose=args.verbose,
+                options=stage_options.get(name),
+            ))
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[DONE] 결과 저장 → {args.json_path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare_with_baseline(results, json.load(f), args.tolerance)
+        if problems:
+            print("[FAIL] 성능 저하 감지:")
+            for p in problems:
+                print(f"  - {p}")
+            return 1
+        print("[OK] 비교 가능한 단계에서 기준 대비 성능 저하 없음")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
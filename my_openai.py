@@ -12,24 +12,65 @@ if not api_key:
 client = OpenAI(api_key = api_key)
 
 
-def question(system_content, prompt):
+def question(system_content, prompt, max_tokens=None):
         
     try:
         message = [{"role":"system", "content":" ".join(system_content)}, 
                    {"role":"user","content":f"{prompt}"}]
+
+        # max_tokens 지정 시 서버에서 생성 길이를 끊음
+        options = {"max_tokens": max_tokens} if max_tokens else {}
             
         completion = client.chat.completions.create(
                 model="gpt-4o",
                 messages=message,
-                temperature=0.2
+                temperature=0.2,
+                **options
             )
 
         result = completion.choices[0].message.content
 
+        if completion.choices[0].finish_reason == "length":
+            print(f"[WARN] max_tokens({max_tokens})에 걸려 응답이 잘렸습니다.")
+
         return result
 
     except Exception as e:
         print(f"Error : {e}")
+
+
+def question_stream(system_content, prompt, max_tokens=None):
+    """
+    question()의 스트리밍 버전.
+    응답 토큰이 도착하는 대로 문자열 조각을 yield 한다.
+    연결 실패나 스트림 중간 오류는 잘린 결과가 성공처럼 쓰이지 않도록
+    잡지 않고 호출한 쪽으로 그대로 올린다.
+    """
+    message = [{"role":"system", "content":" ".join(system_content)}, 
+               {"role":"user","content":f"{prompt}"}]
+
+    options = {"max_tokens": max_tokens} if max_tokens else {}
+
+    stream = client.chat.completions.create(
+            model="gpt-4o",
+            messages=message,
+            temperature=0.2,
+            stream=True,
+            **options
+        )
+
+    finish_reason = None
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+        if choice.delta.content:
+            yield choice.delta.content
+
+    if finish_reason == "length":
+        print(f"[WARN] max_tokens({max_tokens})에 걸려 응답이 잘렸습니다.")
         
 if __name__ == "__main__":
     system_content = [
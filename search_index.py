@@ -0,0 +1,404 @@
+"""
+논문 초록 / 뉴스 요약 / 이사회 안건을 한 번에 찾는 로컬 전문 검색 인덱스.
+
+SQLite FTS5 위에 한국어 2-gram 토큰화를 직접 적용해서 저장한다.
+(조사가 붙은 '세륨을' 도 '세륨' 으로 검색되도록 단어를 2글자씩 겹쳐 자름)
+파이프라인이 엑셀을 저장할 때마다 바뀐 행만 다시 색인하고,
+문서마다 어느 파일(origin)에 들어있는지 기록해 두어
+모든 파일에서 사라진 행만 색인에서 지운다.
+
+- papers : 초록                (key: DOI, normalize_doi 기준 / 없으면 NO)
+- news   : 요약                (key: 링크)
+- agenda : title + result 1건  (key: source|type|number)
+
+사용 예)
+    python search_index.py build
+    python search_index.py query 세륨
+    python search_index.py query "PBS 폐지" --source news --limit 5
+"""
+import argparse
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pandas as pd
+
+INDEX_PATH = "search_index.db"
+NGRAM = 2
+
+# build 명령에서 기본으로 색인하는 엑셀 파일
+DEFAULT_SOURCES = {
+    "papers": ["2.NTIS_PAPER_with_topic_tags.xlsx"],
+    "news": ["news_data_final.xlsx", "1.news_data_final.xlsx", "news_store/*.csv"],
+    "agenda": ["agenda_summary.xlsx"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    doc_key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    title TEXT,
+    body TEXT,
+    content_hash TEXT,
+    updated_at TEXT,
+    UNIQUE (source, doc_key, field)
+);
+CREATE TABLE IF NOT EXISTS document_origins (
+    doc_id INTEGER NOT NULL,
+    origin TEXT NOT NULL,
+    PRIMARY KEY (doc_id, origin)
+);
+CREATE INDEX IF NOT EXISTS document_origins_origin ON document_origins (origin);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(grams);
+"""
+
+# (doc_key, field, title, body)
+Record = Tuple[str, str, str, str]
+
+
+def normalize_doi(raw: str) -> str:
+    """
+    엑셀에서 읽은 DOI 문자열을
+    - 순수 DOI만 남기도록 정규화.
+    예) 'https://doi.org/10.1016/j.cej.2023.145834'
+        → '10.1016/j.cej.2023.145834'
+    초록 수집(2.get_abstract.py)과 색인 키가 같은 규칙을 쓰도록 여기에 둔다.
+    """
+    if not isinstance(raw, str):
+        return ""
+
+    doi = raw.strip()
+
+    # URL 형식인 경우 처리
+    if doi.lower().startswith("http"):
+        parsed = urlparse(doi)
+        # path 부분 (/10.1016/...) 에서 / 제거
+        doi = parsed.path.lstrip("/")
+
+    # 앞뒤 공백/따옴표 같은 거 제거
+    return doi.strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """정규화(NFKC, 소문자) 후 문장부호/공백 기준으로 단어 분리."""
+    if not isinstance(text, str):
+        return []
+    text = unicodedata.normalize("NFKC", text).lower()
+    return re.findall(r"\w+", text)
+
+
+def ngrams(word: str, n: int = NGRAM) -> List[str]:
+    if len(word) <= n:
+        return [word]
+    return [word[i:i + n] for i in range(len(word) - n + 1)]
+
+
+def to_grams(text: str) -> str:
+    """색인용 문자열: 모든 단어를 n-gram으로 잘라 공백으로 이어붙임."""
+    return " ".join(g for word in tokenize(text) for g in ngrams(word))
+
+
+def build_match_query(query: str) -> str:
+    """
+    검색어 → FTS5 MATCH 식.
+    단어마다 n-gram을 연속 구문("ab bc")으로 묶고, 단어끼리는 AND.
+    n보다 짧은 단어는 접두어 검색으로 처리.
+    """
+    terms = []
+    for word in tokenize(query):
+        if len(word) < NGRAM:
+            terms.append(f'"{word}"*')
+        else:
+            terms.append('"' + " ".join(ngrams(word)) + '"')
+    return " ".join(terms)
+
+
+def connect(db_path: str = INDEX_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+
+    # document_origins 가 없던 이전 색인 파일: 문서가 어느 파일들에 있는지 알 수 없어
+    # 지울 수도 없으므로 비우고 다시 색인
+    tables = {r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "documents" in tables and "document_origins" not in tables:
+        with conn:
+            conn.execute("DROP TABLE documents")
+            conn.execute("DROP TABLE IF EXISTS documents_fts")
+        print(f"[WARN] 이전 형식 색인을 초기화했습니다. 'python search_index.py build' 로 다시 색인하세요: {db_path}")
+
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _delete_documents(conn: sqlite3.Connection, ids: List[int]):
+    for doc_id in ids:
+        conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+        conn.execute("DELETE FROM document_origins WHERE doc_id = ?", (doc_id,))
+        conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+
+def index_records(
+    source: str,
+    records: Iterable[Record],
+    db_path: str = INDEX_PATH,
+    origin: Optional[str] = None,
+    prune: bool = False,
+) -> Dict[str, int]:
+    """
+    레코드를 색인. 내용 해시가 같으면 건너뛰고, 바뀐 것만 다시 넣는다.
+    origin: 레코드를 읽은 파일 경로. 문서마다 자신을 담고 있는 origin 들을 모두 기록한다.
+    prune=True 면 records 를 origin 파일의 전체 내용으로 보고,
+    이번 records 에 없는 문서(삭제된 행, LLM이 바꾼 안건 키 등)에서 origin 을 떼어낸 뒤
+    더 이상 어느 origin 에도 없는 문서만 지운다.
+    반환: {"added": n, "updated": n, "unchanged": n, "removed": n}
+    """
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    origin = os.path.abspath(origin) if origin else None
+    kept = set()
+
+    conn = connect(db_path)
+    try:
+        with conn:
+            for doc_key, field, title, body in records:
+                if not body:
+                    continue
+
+                content_hash = hashlib.sha1(f"{title}\x1f{body}".encode("utf-8")).hexdigest()
+                row = conn.execute(
+                    "SELECT id, content_hash FROM documents WHERE source = ? AND doc_key = ? AND field = ?",
+                    (source, doc_key, field),
+                ).fetchone()
+
+                if row and row["content_hash"] == content_hash:
+                    doc_id = row["id"]
+                    stats["unchanged"] += 1
+                elif row:
+                    grams = to_grams(f"{title}\n{body}")
+                    doc_id = row["id"]
+                    conn.execute(
+                        "UPDATE documents SET title = ?, body = ?, content_hash = ?, updated_at = ? WHERE id = ?",
+                        (title, body, content_hash, now, doc_id),
+                    )
+                    conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+                    conn.execute("INSERT INTO documents_fts (rowid, grams) VALUES (?, ?)", (doc_id, grams))
+                    stats["updated"] += 1
+                else:
+                    grams = to_grams(f"{title}\n{body}")
+                    cur = conn.execute(
+                        "INSERT INTO documents (source, doc_key, field, title, body, content_hash, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (source, doc_key, field, title, body, content_hash, now),
+                    )
+                    doc_id = cur.lastrowid
+                    conn.execute("INSERT INTO documents_fts (rowid, grams) VALUES (?, ?)", (doc_id, grams))
+                    stats["added"] += 1
+
+                kept.add(doc_id)
+                if origin:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO document_origins (doc_id, origin) VALUES (?, ?)",
+                        (doc_id, origin),
+                    )
+
+            if origin and prune:
+                detached = [
+                    r["doc_id"]
+                    for r in conn.execute(
+                        "SELECT o.doc_id FROM document_origins o JOIN documents d ON d.id = o.doc_id "
+                        "WHERE d.source = ? AND o.origin = ?",
+                        (source, origin),
+                    )
+                    if r["doc_id"] not in kept
+                ]
+                for doc_id in detached:
+                    conn.execute("DELETE FROM document_origins WHERE doc_id = ? AND origin = ?", (doc_id, origin))
+
+                # 다른 파일에 아직 남아 있는 문서는 그대로 둔다
+                stale = [
+                    doc_id
+                    for doc_id in detached
+                    if not conn.execute("SELECT 1 FROM document_origins WHERE doc_id = ?", (doc_id,)).fetchone()
+                ]
+                _delete_documents(conn, stale)
+                stats["removed"] = len(stale)
+    finally:
+        conn.close()
+
+    return stats
+
+
+def _cell(value) -> str:
+    """엑셀 셀 값을 문자열로. 결측값은 빈 문자열."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    text = str(value).strip()
+    return "" if text.lower() in ("nan", "none") else text
+
+
+def _first_per_key(records: Iterable[Record]) -> List[Record]:
+    """
+    같은 키가 여러 행에 있으면(연도별 중복 DOI 등) 본문이 있는 첫 행만 남긴다.
+    다시 색인할 때 행끼리 서로 덮어써서 매번 갱신되는 것을 막기 위함.
+    """
+    kept: Dict[Tuple[str, str], Record] = {}
+    for record in records:
+        if record[3]:
+            kept.setdefault((record[0], record[1]), record)
+    return list(kept.values())
+
+
+# 아래 index_* 함수의 origin/prune 은 index_records 참고.
+# 파이프라인처럼 파일 전체를 넘길 때는 origin=파일 경로, prune=True 로 호출한다.
+
+def index_papers(
+    df: pd.DataFrame, db_path: str = INDEX_PATH, origin: Optional[str] = None, prune: bool = False
+) -> Dict[str, int]:
+    """논문 엑셀(초록)을 색인."""
+    records = []
+    for idx, row in df.iterrows():
+        doc_key = normalize_doi(_cell(row.get("DOI"))) or f"NO:{_cell(row.get('NO')) or idx}"
+        records.append((doc_key, "초록", _cell(row.get("논문명")), _cell(row.get("초록"))))
+    return index_records("papers", _first_per_key(records), db_path, origin, prune)
+
+
+def index_news(
+    df: pd.DataFrame, db_path: str = INDEX_PATH, origin: Optional[str] = None, prune: bool = False
+) -> Dict[str, int]:
+    """뉴스 엑셀(요약)을 색인."""
+    records = []
+    for _, row in df.iterrows():
+        link = _cell(row.get("링크"))
+        if link:
+            records.append((link, "요약", _cell(row.get("제목")), _cell(row.get("요약"))))
+    return index_records("news", _first_per_key(records), db_path, origin, prune)
+
+
+def index_agenda(
+    df: pd.DataFrame, db_path: str = INDEX_PATH, origin: Optional[str] = None, prune: bool = False
+) -> Dict[str, int]:
+    """
+    이사회 안건 엑셀을 색인. 안건 1건당 문서 1개(제목 + 처리결과)로 넣어
+    제목 단어로 검색해도 같은 안건이 두 번 나오지 않게 한다.
+    """
+    records = []
+    for _, row in df.iterrows():
+        doc_key = "|".join(_cell(row.get(c)) for c in ("source", "type", "number"))
+        title = _cell(row.get("title"))
+        records.append((doc_key, "안건", title, _cell(row.get("result")) or title))
+    return index_records("agenda", _first_per_key(records), db_path, origin, prune)
+
+
+INDEXERS = {"papers": index_papers, "news": index_news, "agenda": index_agenda}
+
+
+def make_snippet(body: str, query: str, width: int = 40) -> str:
+    """본문에서 검색어가 처음 나오는 위치 주변을 잘라서 반환."""
+    lowered = unicodedata.normalize("NFKC", body).lower()
+    pos = -1
+    for word in tokenize(query):
+        pos = lowered.find(word)
+        if pos != -1:
+            break
+
+    if pos == -1:
+        return body[:width * 2]
+
+    start = max(pos - width, 0)
+    end = min(pos + width, len(body))
+    return ("…" if start else "") + body[start:end] + ("…" if end < len(body) else "")
+
+
+def search(
+    query: str,
+    source: Optional[str] = None,
+    limit: int = 20,
+    db_path: str = INDEX_PATH,
+) -> List[Dict]:
+    """
+    검색어로 색인을 조회해 관련도(bm25) 순으로 반환.
+    각 결과: {source, key, field, title, snippet}
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    sql = (
+        "SELECT d.source, d.doc_key, d.field, d.title, d.body "
+        "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+        "WHERE documents_fts MATCH ?"
+    )
+    params: List = [match]
+    if source:
+        sql += " AND d.source = ?"
+        params.append(source)
+    sql += " ORDER BY bm25(documents_fts) LIMIT ?"
+    params.append(limit)
+
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "source": r["source"],
+            "key": r["doc_key"],
+            "field": r["field"],
+            "title": r["title"],
+            "snippet": make_snippet(r["body"], query),
+        }
+        for r in rows
+    ]
+
+
+def build(db_path: str = INDEX_PATH, sources: Optional[Dict[str, List[str]]] = None):
+    """엑셀/CSV 파일들을 읽어 색인 갱신 (바뀐 행만 반영)."""
+    for source, patterns in (sources or DEFAULT_SOURCES).items():
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern)):
+                df = pd.read_csv(path, encoding="utf-8-sig") if path.lower().endswith(".csv") else pd.read_excel(path)
+                stats = INDEXERS[source](df, db_path, origin=path, prune=True)
+                print(
+                    f"[INFO] {source} ← {path}: 추가 {stats['added']}, "
+                    f"갱신 {stats['updated']}, 변경없음 {stats['unchanged']}, 삭제 {stats['removed']}"
+                )
+    print(f"[DONE] 색인 완료 → {db_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="초록/뉴스 요약/안건 전문 검색")
+    parser.add_argument("--db", default=INDEX_PATH, help="색인 파일 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("build", help="기본 엑셀 파일들로 색인 갱신")
+
+    q = sub.add_parser("query", help="검색")
+    q.add_argument("text", help="검색어")
+    q.add_argument("--source", choices=sorted(INDEXERS), help="검색 대상 제한")
+    q.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build(args.db)
+    else:
+        t0 = time.perf_counter()
+        results = search(args.text, source=args.source, limit=args.limit, db_path=args.db)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        for r in results:
+            print(f"[{r['source']}/{r['field']}] {r['title'][:60]}")
+            print(f"    {r['key']}")
+            print(f"    {r['snippet']}")
+        print(f"{len(results)}건 ({elapsed_ms:.2f} ms)")